@@ -1,26 +1,138 @@
 import json
 import logging
+import os
+import select
+import socket
 import subprocess
+import time
+import uuid
+from http.client import HTTPConnection, HTTPException
 from pathlib import Path
+from urllib.parse import urlparse
 
-from rc_common import RoughCutError, run_command
+from rc_common import RoughCutError, interrupted, run_command
 
 logger = logging.getLogger(__name__)
 
 
-def extract_audio(video_path, output_path):
+def extract_audio(video_path, output_path, duration=None):
     """Extract audio from video as 16kHz mono WAV"""
     cmd = [
         'ffmpeg', '-i', str(video_path),
         '-vn', '-acodec', 'pcm_s16le', '-ar', '16000', '-ac', '1',
         str(output_path), '-y'
     ]
-    run_command(cmd, "Extracting audio")
+    run_command(cmd, "Extracting audio", duration=duration)
 
 
-def transcribe_audio(audio_path, output_path):
-    """Transcribe audio with whisper-cli"""
-    whisper_model = Path.home() / '.whisper' / 'models' / 'ggml-large-v3-turbo.bin'
+def decode_pcm(video_path, output_path, sample_rate=48000, channels=2, duration=None):
+    """Decode the audio stream to raw s16le PCM (video stream is never decoded)"""
+    cmd = [
+        'ffmpeg', '-i', str(video_path),
+        '-vn', '-f', 's16le', '-acodec', 'pcm_s16le',
+        '-ar', str(sample_rate), '-ac', str(channels),
+        str(output_path), '-y'
+    ]
+    run_command(cmd, "Decoding audio", duration=duration)
+
+
+WHISPER_SERVER_URL = os.environ.get('WHISPER_SERVER_URL', 'http://127.0.0.1:8178')
+SERVER_IO_TIMEOUT = 30  # seconds for connecting, uploading and reading the response
+SERVER_POLL = 0.25  # seconds between interrupt checks while the server transcribes
+
+
+def whisper_model_path():
+    """Path to the whisper ggml model used by whisper-cli and whisper-server"""
+    return Path.home() / '.whisper' / 'models' / 'ggml-large-v3-turbo.bin'
+
+
+def whisper_server_available(server_url=WHISPER_SERVER_URL, timeout=0.5):
+    """Check whether a whisper-server is listening at server_url"""
+    parsed = urlparse(server_url)
+    try:
+        with socket.create_connection((parsed.hostname, parsed.port or 80), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def server_segments_to_transcription(segments):
+    """Convert whisper-server verbose_json segments to whisper-cli transcription entries"""
+    transcription = []
+    for seg in segments:
+        entry = {
+            'offsets': {'from': int(round(seg['start'] * 1000)), 'to': int(round(seg['end'] * 1000))},
+            'text': seg['text'],
+        }
+        if seg.get('words'):
+            # Word timings, in the shape of whisper-cli --output-json-full tokens
+            entry['tokens'] = [
+                {
+                    'text': ' ' + w['word'].strip(),
+                    'offsets': {'from': int(round(w['start'] * 1000)), 'to': int(round(w['end'] * 1000))},
+                }
+                for w in seg['words']
+            ]
+        transcription.append(entry)
+    return transcription
+
+
+def transcribe_with_server(audio_path, output_path, server_url=WHISPER_SERVER_URL, timeout=None):
+    """
+    Transcribe audio with a running whisper-server (model stays loaded between files).
+
+    Waiting for the response polls for interrupts, so Ctrl-C is not held up
+    until the server finishes the file. `timeout` bounds the whole request.
+    """
+    boundary = uuid.uuid4().hex
+    audio_bytes = Path(audio_path).read_bytes()
+    body = b''.join([
+        f'--{boundary}\r\nContent-Disposition: form-data; name="response_format"\r\n\r\nverbose_json\r\n'.encode(),
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{Path(audio_path).name}"\r\n'
+        f'Content-Type: audio/wav\r\n\r\n'.encode(),
+        audio_bytes,
+        f'\r\n--{boundary}--\r\n'.encode(),
+    ])
+    parsed = urlparse(server_url)
+    path = parsed.path.rstrip('/') + '/inference'
+
+    logger.info("Transcribing audio (whisper-server)...")
+    started = time.monotonic()
+    conn = HTTPConnection(parsed.hostname, parsed.port or 80, timeout=SERVER_IO_TIMEOUT)
+    try:
+        conn.request('POST', path, body=body,
+                     headers={'Content-Type': f'multipart/form-data; boundary={boundary}'})
+        # The server sends nothing until it has transcribed the whole file
+        while not select.select([conn.sock], [], [], SERVER_POLL)[0]:
+            if interrupted():
+                raise RoughCutError("Interrupted: whisper-server transcription")
+            if timeout is not None and time.monotonic() - started > timeout:
+                raise RoughCutError(f"Timed out: whisper-server transcription after {timeout}s")
+        response = conn.getresponse()
+        if response.status != 200:
+            raise RoughCutError(f"whisper-server error: HTTP {response.status} {response.reason}")
+        data = json.load(response)
+    except (HTTPException, OSError) as e:
+        raise RoughCutError(f"whisper-server request failed: {e}")
+    except json.JSONDecodeError:
+        raise RoughCutError("whisper-server returned invalid JSON")
+    finally:
+        conn.close()
+
+    if 'segments' not in data:
+        raise RoughCutError(f"whisper-server error: {data.get('error', data)}")
+
+    with open(output_path, 'w') as f:
+        json.dump({'transcription': server_segments_to_transcription(data['segments'])}, f)
+
+
+def transcribe_audio(audio_path, output_path, server_url=None):
+    """Transcribe audio via whisper-server when reachable, else with whisper-cli"""
+    if server_url and whisper_server_available(server_url):
+        transcribe_with_server(audio_path, output_path, server_url)
+        return
+
+    whisper_model = whisper_model_path()
 
     if not whisper_model.exists():
         raise RoughCutError(f"Whisper model not found: {whisper_model}")
@@ -29,7 +141,7 @@ def transcribe_audio(audio_path, output_path):
         'whisper-cli',
         '-m', str(whisper_model),
         '-f', str(audio_path),
-        '--output-json'
+        '--output-json-full'
     ]
 
     run_command(cmd, "Transcribing audio")
@@ -67,7 +179,7 @@ def get_video_duration(video_path):
         '-of', 'default=noprint_wrappers=1:nokey=1',
         str(video_path)
     ]
-    result = run_command(cmd, "Getting video duration", capture_output=True)
+    result = run_command(cmd, "Getting video duration", capture_output=True, timeout=60)
     try:
         return float(result.stdout.strip())
     except ValueError:
@@ -75,7 +187,11 @@ def get_video_duration(video_path):
 
 
 def get_transcript_for_segment(transcript, seg_start, seg_end):
-    """Get transcript text for a time range by overlap"""
+    """Get transcript text for a time range by overlap (segment dicts or CompactTranscript)"""
+    if hasattr(transcript, 'overlapping'):
+        indices = transcript.overlapping(seg_start * 1000, seg_end * 1000)
+        return ' '.join(transcript.text(i).strip() for i in indices), indices
+
     texts = []
     indices = []
     for i, seg in enumerate(transcript):
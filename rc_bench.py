@@ -0,0 +1,240 @@
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+WORDS = ('so', 'today', 'we', 'are', 'going', 'to', 'look', 'at', 'how', 'the', 'timeline',
+         'works', 'with', 'markers', 'and', 'clips', 'when', 'you', 'export', 'it')
+NOUNS = ('Python', 'Claude Code', 'Final Cut Pro', 'Stripe', 'GitHub', 'Vercel', 'Rust')
+
+
+def synth_bursts(duration, speech=4.0, gap=1.0):
+    """Speech bursts as (start, end) pairs: `speech` seconds on, `gap` seconds off"""
+    bursts = []
+    t = gap
+    while t + speech <= duration:
+        bursts.append((t, t + speech))
+        t += speech + gap
+    return bursts
+
+
+def synth_silences(bursts, duration):
+    """Silence dicts (load_silences format) for the gaps around bursts"""
+    silences = []
+    cursor = 0.0
+    for start, end in bursts:
+        if start > cursor:
+            silences.append({'start': cursor, 'end': start})
+        cursor = end
+    if duration > cursor:
+        silences.append({'start': cursor, 'end': duration})
+    return silences
+
+
+def synth_sentence(rng, n_words=10):
+    """Random sentence, with a proper noun mid-sentence about half the time"""
+    words = [rng.choice(WORDS) for _ in range(n_words)]
+    if rng.random() < 0.5:
+        words.insert(rng.randrange(1, n_words), rng.choice(NOUNS))
+    sentence = ' '.join(words)
+    return sentence[:1].upper() + sentence[1:] + '.'  # not capitalize(): keep noun case
+
+
+def synth_texts(n, take_every=5, takes=3, seed=0):
+    """
+    Clip texts with repeated takes.
+
+    Every `take_every`-th clip starts a run of `takes` clips sharing their
+    first words, the way a re-recorded line looks in a whisper transcript.
+    """
+    rng = random.Random(seed)
+    texts = []
+    while len(texts) < n:
+        if take_every and len(texts) % take_every == 0:
+            opener = ' '.join(rng.choice(WORDS) for _ in range(4)).capitalize()
+            for _ in range(min(takes, n - len(texts))):
+                sentence = synth_sentence(rng)
+                texts.append(f"{opener} {sentence[:1].lower()}{sentence[1:]}")
+        else:
+            texts.append(synth_sentence(rng))
+    return texts
+
+
+def synth_transcript(bursts, seed=0):
+    """Whisper --output-json style dict with one segment per burst"""
+    texts = synth_texts(len(bursts), seed=seed)
+    return {
+        'transcription': [
+            {
+                'offsets': {'from': int(start * 1000), 'to': int(end * 1000)},
+                'text': f" {text}",
+            }
+            for (start, end), text in zip(bursts, texts)
+        ]
+    }
+
+
+def synth_intervals(n_clips, speech=4.0, gap=1.0, seed=0):
+    """Speech intervals (invert_silences format) labeled with synthetic text"""
+    bursts = synth_bursts(n_clips * (speech + gap) + gap, speech, gap)[:n_clips]
+    texts = synth_texts(len(bursts), seed=seed)
+    return [
+        {'start': start, 'end': end, 'duration': end - start, 'text': text, 'indices': [i]}
+        for i, ((start, end), text) in enumerate(zip(bursts, texts))
+    ]
+
+
+def synth_media(output_path, duration, speech=4.0, gap=1.0, video=False):
+    """Render a tone/silence pattern with ffmpeg lavfi (optionally with a tiny video stream)"""
+    period = speech + gap
+    tone = f"aevalsrc='0.5*sin(2*PI*440*t)*gte(mod(t,{period}),{gap})':s=48000:d={duration}"
+    cmd = ['ffmpeg', '-v', 'error', '-f', 'lavfi', '-i', tone]
+    if video:
+        cmd += ['-f', 'lavfi', '-i', f"color=c=gray:s=320x180:r=30:d={duration}",
+                '-c:v', 'libx264', '-preset', 'ultrafast', '-c:a', 'aac', '-shortest']
+    cmd += [str(output_path), '-y']
+    subprocess.run(cmd, check=True)
+
+
+def write_whisper_stub(stub_dir, transcript):
+    """
+    Create a fake whisper-cli (and model file) that emits `transcript`.
+
+    Returns the env overrides (PATH, HOME) that make rc_audio.transcribe_audio use it.
+    """
+    stub_dir = Path(stub_dir)
+    model = stub_dir / '.whisper' / 'models' / 'ggml-large-v3-turbo.bin'
+    model.parent.mkdir(parents=True, exist_ok=True)
+    model.touch()
+
+    canned = stub_dir / 'transcript.json'
+    canned.write_text(json.dumps(transcript))
+
+    stub = stub_dir / 'bin' / 'whisper-cli'
+    stub.parent.mkdir(exist_ok=True)
+    stub.write_text(f'''#!{sys.executable}
+import shutil, sys
+audio = sys.argv[sys.argv.index('-f') + 1]
+shutil.copy({str(canned)!r}, audio + '.json')
+''')
+    stub.chmod(0o755)
+
+    return {
+        'PATH': f"{stub.parent}{os.pathsep}{os.environ.get('PATH', '')}",
+        'HOME': str(stub_dir),
+    }
+
+
+@contextmanager
+def patched_env(overrides):
+    """Temporarily apply environment variable overrides"""
+    saved = {key: os.environ.get(key) for key in overrides}
+    os.environ.update(overrides)
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+class StageTimer:
+    """
+    Collects wall time per named stage, and Python peak memory when trace_memory.
+
+    tracemalloc slows allocation-heavy code several times over, so a traced
+    run's wall times are not comparable with an untraced one. Time with an
+    untraced timer and take memory from a separate traced run (merge_memory).
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start
+            self.stages[name] = {'wall_s': round(wall, 6)}
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self.stages[name]['peak_mb'] = round(peak / 2**20, 3)
+
+
+def merge_memory(stages, traced_stages):
+    """Copy peak_mb from a traced run's stages onto an untraced run's stages"""
+    for name, stage in stages.items():
+        if name in traced_stages and 'peak_mb' in traced_stages[name]:
+            stage['peak_mb'] = traced_stages[name]['peak_mb']
+    return stages
+
+
+def peak_rss_mb():
+    """Peak RSS of this process and its children, in MB"""
+    scale = 1 if sys.platform == 'darwin' else 1024  # bytes on macOS, KB on Linux
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    child_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return round(max(self_rss, child_rss) / 2**20, 1)
+
+
+def git_revision(repo_dir):
+    """Short git revision of repo_dir, or None"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=repo_dir,
+                                capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    """Load benchmark history (list of run records)"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def append_history(path, record):
+    """Append a run record to the JSON history file"""
+    history = load_history(path)
+    history.append(record)
+    with open(path, 'w') as f:
+        json.dump(history, f, indent=2)
+
+
+def previous_run(history, key):
+    """Most recent recorded run with the same benchmark key"""
+    for record in reversed(history):
+        if record.get('key') == key:
+            return record
+    return None
+
+
+def make_record(key, params, stages, repo_dir):
+    """Build a history record for one benchmark case"""
+    return {
+        'key': key,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(repo_dir),
+        'params': params,
+        'total_s': round(sum(s['wall_s'] for s in stages.values()), 6),
+        'peak_rss_mb': peak_rss_mb(),
+        'stages': stages,
+    }
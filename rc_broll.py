@@ -1,4 +1,32 @@
+import logging
 import re
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from rc_common import RoughCutError, run_command
+
+logger = logging.getLogger(__name__)
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+EXCLUDE = frozenset({
+    'I', 'A', 'An', 'The', 'In', 'On', 'At', 'To', 'For', 'Of', 'And', 'Or', 'But',
+    'My', 'Your', 'His', 'Her', 'Its', 'Our', 'Their', 'We', 'You', 'He', 'She', 'It',
+    'They', 'What', 'When', 'Where', 'Why', 'How', 'This', 'That', 'These', 'Those',
+    'Let', 'Now', 'So', 'Well', 'Just', 'Then', 'Here', 'There'})
+
+MULTI_WORD_RE = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)+\b')
+SENTENCE_SPLIT_RE = re.compile(r'[.!?]\s+')
+CAP_WORD_RE = re.compile(r'^([A-Z][a-z]+)')
+CLIP_SEPARATOR = '. '  # sentence break between clips in detect_timeline_nouns
+SAVED_RE = re.compile(r'Saved(?: to)?: (.+?)(?: \([^)]*\))?$')
+
+# Asset kinds -> (script, extra args). The scripts own the company/domain mapping.
+ASSET_FETCHERS = {
+    'logo': ('get-logo', []),
+    'screenshot': ('get-screenshot', ['--headless']),
+}
 
 
 def detect_proper_nouns(text):
@@ -6,40 +34,113 @@ def detect_proper_nouns(text):
     if not text:
         return []
 
-    exclude = {'I', 'A', 'An', 'The', 'In', 'On', 'At', 'To', 'For', 'Of', 'And', 'Or', 'But',
-               'My', 'Your', 'His', 'Her', 'Its', 'Our', 'Their', 'We', 'You', 'He', 'She', 'It',
-               'They', 'What', 'When', 'Where', 'Why', 'How', 'This', 'That', 'These', 'Those',
-               'Let', 'Now', 'So', 'Well', 'Just', 'Then', 'Here', 'There'}
-
     proper_nouns = set()
-    multi_word_phrases = set()
 
     # Find multi-word capitalized phrases
-    multi_word = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)+\b', text)
-    for phrase in multi_word:
-        proper_nouns.add(phrase)
-        multi_word_phrases.add(phrase)
+    multi_word = MULTI_WORD_RE.findall(text)
+    proper_nouns.update(multi_word)
+    phrase_words = {word for phrase in multi_word for word in phrase.split()}
 
     # Find mid-sentence capitalized words
-    sentences = re.split(r'[.!?]\s+', text)
-
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence:
-            continue
-
+    for sentence in SENTENCE_SPLIT_RE.split(text):
         words = sentence.split()
 
-        for i in range(1, len(words)):
-            word = words[i]
-            match = re.match(r'^([A-Z][a-z]+)', word)
+        for word in words[1:]:
+            match = CAP_WORD_RE.match(word)
             if match:
                 cap_word = match.group(1)
-                if len(cap_word) < 4:
+                if len(cap_word) < 4 or cap_word in EXCLUDE:
                     continue
-                if cap_word not in exclude:
-                    is_part_of_phrase = any(cap_word in phrase for phrase in multi_word_phrases)
-                    if not is_part_of_phrase:
-                        proper_nouns.add(cap_word)
+                if cap_word not in phrase_words:
+                    proper_nouns.add(cap_word)
 
     return sorted(proper_nouns)
+
+
+def detect_timeline_nouns(texts):
+    """
+    Detect proper nouns across a whole timeline in one pass.
+
+    The clip texts are joined with sentence breaks and each regex runs once
+    over the result; matches are mapped back to clips by offset. Gives the
+    same nouns as detect_proper_nouns on each text.
+
+    Returns: (per_clip, unique)
+        per_clip: list of sorted noun lists, one per input text
+        unique: nouns across all texts, in order of first appearance
+    """
+    texts = [text or '' for text in texts]
+    joined = CLIP_SEPARATOR.join(texts)
+    starts = []
+    pos = 0
+    for text in texts:
+        starts.append(pos)
+        pos += len(text) + len(CLIP_SEPARATOR)
+
+    nouns = [set() for _ in texts]
+    phrase_words = [set() for _ in texts]
+    for match in MULTI_WORD_RE.finditer(joined):
+        clip = bisect_right(starts, match.start()) - 1
+        nouns[clip].add(match.group())
+        phrase_words[clip].update(match.group().split())
+
+    # Sentences never span clips: the separator always ends one
+    sentence_start = 0
+    for boundary in [*SENTENCE_SPLIT_RE.finditer(joined), None]:
+        sentence_end = boundary.start() if boundary else len(joined)
+        clip = bisect_right(starts, sentence_start) - 1
+        for word in joined[sentence_start:sentence_end].split()[1:]:
+            match = CAP_WORD_RE.match(word)
+            if match:
+                cap_word = match.group(1)
+                if len(cap_word) < 4 or cap_word in EXCLUDE:
+                    continue
+                if cap_word not in phrase_words[clip]:
+                    nouns[clip].add(cap_word)
+        if boundary:
+            sentence_start = boundary.end()
+
+    per_clip = [sorted(clip_nouns) for clip_nouns in nouns]
+    unique = list(dict.fromkeys(noun for clip_nouns in per_clip for noun in clip_nouns))
+    return per_clip, unique
+
+
+def parse_saved_path(output):
+    """Extract the saved asset path from get-logo/get-screenshot output"""
+    lines = output.splitlines()
+    for i, line in enumerate(lines):
+        match = SAVED_RE.search(line.strip())
+        if match:
+            return match.group(1)
+        # get-screenshot prints the existing path on the line after a skip
+        if 'File exists' in line and i + 1 < len(lines):
+            return lines[i + 1].strip()
+    return None
+
+
+def fetch_asset(noun, kind, output_dir):
+    """Fetch one B-roll asset with get-logo/get-screenshot, returning its absolute path or None"""
+    script, extra_args = ASSET_FETCHERS[kind]
+    cmd = [str(SCRIPTS_DIR / script), *extra_args, '-o', str(output_dir), noun]
+    try:
+        result = run_command(cmd, f"Fetching {kind} for {noun}", capture_output=True, check=False)
+    except (OSError, RoughCutError) as e:
+        logger.warning(f"  Could not run {script}: {e}")
+        return None
+
+    path = parse_saved_path(result.stdout)
+    if result.returncode != 0 or not path or not Path(path).exists():
+        logger.warning(f"  No {kind} for {noun}")
+        return None
+    return str(Path(path).resolve())
+
+
+def fetch_assets(nouns, kind, output_dir, max_workers=4):
+    """Fetch each unique noun's asset once, in parallel. Returns {noun: path}"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    unique = list(dict.fromkeys(nouns))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        paths = pool.map(lambda noun: fetch_asset(noun, kind, output_dir), unique)
+        return {noun: path for noun, path in zip(unique, paths) if path}
@@ -1,25 +1,256 @@
+import asyncio
+import atexit
 import logging
+import os
+import re
+import shlex
+import signal
 import subprocess
+import sys
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+TERMINATE_GRACE = 5  # seconds between SIGTERM and SIGKILL
+WHISPER_PROGRESS_RE = re.compile(r'progress\s*=\s*(\d+)%')
+
+# Process groups of running commands, so interrupts never leak children.
+# Commands run in their own session (a terminal Ctrl-C does not reach them),
+# so SIGINT and interpreter exit kill them here, whichever thread started them.
+_active_groups = set()
+_active_lock = threading.Lock()
+_interrupted = threading.Event()
+
 
 class RoughCutError(Exception):
     """Base exception for rough-cut errors"""
     pass
 
 
-def run_command(cmd, description, capture_output=False, check=True):
-    """Run a shell command with error handling"""
+class Progress:
+    """One-line live progress display shared by all running commands"""
+
+    def __init__(self, stream=sys.stderr):
+        self.stream = stream
+        self.enabled = stream.isatty()
+        self.lines = {}
+        self.lock = threading.Lock()
+        self.last_draw = 0.0
+
+    def update(self, key, text):
+        with self.lock:
+            self.lines[key] = text
+            now = time.monotonic()
+            if now - self.last_draw >= 0.2:
+                self.last_draw = now
+                self._draw()
+
+    def done(self, key):
+        with self.lock:
+            if self.lines.pop(key, None) is not None and self.enabled:
+                self.stream.write('\r\033[K')
+                self._draw()
+
+    def _draw(self):
+        if self.enabled and self.lines:
+            self.stream.write('\r\033[K' + ' | '.join(self.lines.values()))
+            self.stream.flush()
+
+
+progress = Progress()
+
+
+def format_eta(seconds):
+    """M:SS (or H:MM:SS) for progress display"""
+    seconds = max(0, int(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+def format_progress(description, done, total, started):
+    """'<description> 42% 1:02/2:30 35.1x ETA 0:05' from media seconds done/total"""
+    elapsed = time.monotonic() - started
+    speed = done / elapsed if elapsed > 0 else 0
+    text = f"{description} {format_eta(done)}"
+    if total:
+        text = f"{description} {min(100, done / total * 100):.0f}% {format_eta(done)}/{format_eta(total)}"
+    if speed:
+        text += f" {speed:.1f}x"
+        if total:
+            text += f" ETA {format_eta((total - done) / speed)}"
+    return text
+
+
+def format_percent(description, percent, started):
+    """'<description> 42% ETA 0:05' from a percentage"""
+    text = f"{description} {percent}%"
+    elapsed = time.monotonic() - started
+    if 0 < percent < 100:
+        text += f" ETA {format_eta(elapsed * (100 - percent) / percent)}"
+    return text
+
+
+def _terminate_group(pgid, sig=signal.SIGTERM):
+    try:
+        os.killpg(pgid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def terminate_all():
+    """Kill every running command's process group (also run on SIGINT and at exit)"""
+    with _active_lock:
+        groups = list(_active_groups)
+    for pgid in groups:
+        _terminate_group(pgid, signal.SIGKILL)
+
+
+def interrupted():
+    """True once SIGINT was received; long waits outside run_command should poll this"""
+    return _interrupted.is_set()
+
+
+def _on_sigint(signum, frame):
+    """Kill all running commands, refuse new ones, then raise KeyboardInterrupt as usual"""
+    _interrupted.set()
+    terminate_all()
+    signal.default_int_handler(signum, frame)
+
+
+atexit.register(terminate_all)
+if threading.current_thread() is threading.main_thread() and \
+        signal.getsignal(signal.SIGINT) is signal.default_int_handler:
+    signal.signal(signal.SIGINT, _on_sigint)
+
+
+async def _read_stream(stream, sink, on_line=None):
+    """Collect a subprocess stream into `sink`, calling on_line per line"""
+    while True:
+        line = await stream.readline()
+        if not line:
+            break
+        text = line.decode(errors='replace')
+        if on_line is None or not on_line(text):
+            sink.append(text)
+
+
+async def run_command_async(cmd, description, capture_output=False, check=True, timeout=None,
+                            duration=None):
+    """
+    Run a command without a shell, streaming progress for ffmpeg and whisper-cli.
+
+    ffmpeg gets `-progress pipe:1`, shown as position/speed/ETA (ETA needs
+    `duration`, the input length in seconds). whisper-cli gets
+    `--print-progress`. On timeout, cancellation or error the command's whole
+    process group is terminated.
+
+    Returns a subprocess.CompletedProcess (stdout/stderr set when capture_output).
+    """
+    if isinstance(cmd, str):
+        cmd = shlex.split(cmd)
+    cmd = [str(c) for c in cmd]
+    program = os.path.basename(cmd[0])
+
+    ffmpeg = program == 'ffmpeg'
+    whisper = program == 'whisper-cli'
+    if ffmpeg:
+        cmd = [cmd[0], '-nostats', '-progress', 'pipe:1', *cmd[1:]]
+    elif whisper:
+        cmd = [*cmd, '--print-progress']
+
+    if _interrupted.is_set():
+        raise RoughCutError(f"Interrupted: {description}")
     logger.info(f"{description}...")
+
+    pipe_stdout = capture_output or ffmpeg
+    pipe_stderr = capture_output or whisper
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE if pipe_stdout else None,
+            stderr=asyncio.subprocess.PIPE if pipe_stderr else None,
+            # Never hand the terminal to children: ffmpeg puts a tty stdin in
+            # no-echo mode and only restores it if it exits cleanly
+            stdin=asyncio.subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except FileNotFoundError:
+        raise RoughCutError(f"Command not found: {cmd[0]}")
+
+    with _active_lock:
+        _active_groups.add(proc.pid)
+    if _interrupted.is_set():
+        # Started while an interrupt was killing the other commands
+        _terminate_group(proc.pid, signal.SIGKILL)
+
+    started = time.monotonic()
+    key = object()
+
+    def on_ffmpeg_line(line):
+        name, _, value = line.strip().partition('=')
+        if name == 'out_time_us' and value.isdigit():
+            progress.update(key, format_progress(description, int(value) / 1e6, duration, started))
+        return True  # progress lines never go to captured stdout
+
+    def on_whisper_line(line):
+        match = WHISPER_PROGRESS_RE.search(line)
+        if match:
+            progress.update(key, format_percent(description, int(match.group(1)), started))
+            return True
+        return False
+
+    stdout, stderr = [], []
+    readers = []
+    if pipe_stdout:
+        readers.append(_read_stream(proc.stdout, stdout, on_ffmpeg_line if ffmpeg else None))
+    if pipe_stderr:
+        readers.append(_read_stream(proc.stderr, stderr, on_whisper_line if whisper else None))
+
+    async def communicate():
+        await asyncio.gather(*readers)
+        return await proc.wait()
+
+    display = ' '.join(shlex.quote(c) for c in cmd)
     try:
-        if capture_output:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=check, shell=isinstance(cmd, str))
-            return result
-        else:
-            subprocess.run(cmd, check=check, shell=isinstance(cmd, str))
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Command failed: {' '.join(cmd) if isinstance(cmd, list) else cmd}")
-        if capture_output and e.stderr:
-            logger.error(f"Error: {e.stderr}")
+        returncode = await asyncio.wait_for(communicate(), timeout)
+    except asyncio.TimeoutError:
+        await _stop(proc)
+        logger.error(f"Command timed out after {timeout}s: {display}")
+        raise RoughCutError(f"Timed out: {description}")
+    except BaseException:
+        await _stop(proc)
+        raise
+    finally:
+        progress.done(key)
+        with _active_lock:
+            _active_groups.discard(proc.pid)
+
+    result = subprocess.CompletedProcess(
+        cmd, returncode,
+        ''.join(stdout) if capture_output else None,
+        ''.join(stderr) if capture_output else None,
+    )
+    if check and returncode != 0:
+        logger.error(f"Command failed: {display}")
+        if stderr:
+            logger.error(f"Error: {''.join(stderr[-20:])}")
         raise RoughCutError(f"Failed: {description}")
+    return result
+
+
+async def _stop(proc):
+    """SIGTERM the process group, then SIGKILL if it does not exit in time"""
+    if proc.returncode is not None:
+        return
+    _terminate_group(proc.pid)
+    try:
+        await asyncio.wait_for(asyncio.shield(proc.wait()), TERMINATE_GRACE)
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        _terminate_group(proc.pid, signal.SIGKILL)
+
+
+def run_command(cmd, description, capture_output=False, check=True, timeout=None, duration=None):
+    """Run a command with error handling (blocking wrapper around run_command_async)"""
+    return asyncio.run(run_command_async(cmd, description, capture_output, check, timeout, duration))
@@ -3,9 +3,21 @@
 #   Timeline metadata:  {"rough-cut": {"source_video", "video_duration", "fps"}}
 #   Clip metadata:      {"rough-cut": {"transcript", "transcript_indices"}}
 #   Marker metadata:    {"rough-cut": {"type": "take"|"broll", ...}}
+#                       broll markers may carry "asset" (path) and "asset_kind" ("logo"|"screenshot")
 #   Marker colors:      RED = take, GREEN = broll
 #   Post-roll frames are baked into clip source_range duration at rough-cut time.
 
+import hashlib
+import html
+import json
+import math
+import mmap
+import re
+import sys
+import wave
+from array import array
+from bisect import bisect_left, bisect_right
+from fractions import Fraction
 from pathlib import Path
 from urllib.parse import quote
 
@@ -111,23 +123,28 @@ def generate_fcpxml_from_otio(timeline, width=2560, height=1440):
     return fcpxml, timeline_offset
 
 
-def generate_ffmpeg_filter(timeline):
-    """Generate ffmpeg filter_complex script from OTIO timeline"""
-
-    track = timeline.tracks[0]
-
-    filter_parts = []
-    concat_inputs = []
-    clip_idx = 0
-
-    for item in track:
+def clip_time_ranges(timeline):
+    """Source (start, end) times in seconds for each clip in an OTIO timeline"""
+    ranges = []
+    for item in timeline.tracks[0]:
         if not isinstance(item, otio.schema.Clip):
             continue
 
         sr = item.source_range
         start = sr.start_time.value / sr.start_time.rate
         end = start + sr.duration.value / sr.duration.rate
+        ranges.append((start, end))
+    return ranges
+
+
+def generate_ffmpeg_filter(timeline):
+    """Generate ffmpeg filter_complex script from OTIO timeline"""
+
+    filter_parts = []
+    concat_inputs = []
+    clip_idx = 0
 
+    for start, end in clip_time_ranges(timeline):
         filter_parts.append(
             f'[0:v]trim=start={start:.6f}:end={end:.6f},setpts=PTS-STARTPTS[v{clip_idx}]'
         )
@@ -142,3 +159,291 @@ def generate_ffmpeg_filter(timeline):
     filter_script += f';\n{"".join(concat_inputs)}concat=n={n}:v=1:a=1[outv][outa]'
 
     return filter_script
+
+
+def clip_sample_ranges(timeline, sample_rate=48000):
+    """Source (start, end) sample indices for each clip in an OTIO timeline"""
+    ranges = []
+    for item in timeline.tracks[0]:
+        if not isinstance(item, otio.schema.Clip):
+            continue
+
+        sr = item.source_range
+        start = round(sr.start_time.value * sample_rate / sr.start_time.rate)
+        end = start + round(sr.duration.value * sample_rate / sr.duration.rate)
+        ranges.append((start, end))
+    return ranges
+
+
+def _crossfade(out_bytes, in_bytes, channels):
+    """Linear crossfade between two equal-length s16le PCM blocks"""
+    out_samples = array('h', out_bytes)
+    in_samples = array('h', in_bytes)
+    if sys.byteorder == 'big':
+        out_samples.byteswap()
+        in_samples.byteswap()
+
+    frames = len(out_samples) // channels
+    mixed = array('h', bytes(len(out_samples) * 2))
+    for i in range(len(out_samples)):
+        gain = ((i // channels) + 0.5) / frames
+        value = out_samples[i] * (1 - gain) + in_samples[i] * gain
+        mixed[i] = max(-32768, min(32767, int(round(value))))
+
+    if sys.byteorder == 'big':
+        mixed.byteswap()
+    return mixed.tobytes()
+
+
+def splice_pcm(pcm_path, ranges, output_path, sample_rate=48000, channels=2, crossfade_ms=10):
+    """
+    Write the given sample ranges of a raw s16le PCM file to a WAV file.
+
+    The source is memory-mapped and clip bodies are copied straight from it.
+    Each join is crossfaded over `crossfade_ms`, centred on the cut and using
+    source audio either side of it, so the output length is exactly the sum
+    of the ranges.
+
+    Returns the number of frames written.
+    """
+    frame_bytes = 2 * channels
+    half = int(sample_rate * crossfade_ms / 1000) // 2
+
+    with open(pcm_path, 'rb') as f, wave.open(str(output_path), 'wb') as out:
+        out.setnchannels(channels)
+        out.setsampwidth(2)
+        out.setframerate(sample_rate)
+
+        size = f.seek(0, 2)
+        if not ranges or size == 0:
+            return 0
+
+        total = size // frame_bytes
+        ranges = [(max(0, min(start, total)), max(0, min(end, total))) for start, end in ranges]
+
+        # Half-width of the crossfade at each join, limited by clip lengths and source bounds
+        joins = []
+        for (a_start, a_end), (b_start, b_end) in zip(ranges, ranges[1:]):
+            h = min(half, (a_end - a_start) // 2, (b_end - b_start) // 2,
+                    total - a_end, b_start)
+            joins.append(max(0, h))
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as pcm:
+            written = 0
+            for i, (start, end) in enumerate(ranges):
+                h_in = joins[i - 1] if i > 0 else 0
+                h_out = joins[i] if i < len(joins) else 0
+
+                out.writeframesraw(pcm[(start + h_in) * frame_bytes:(end - h_out) * frame_bytes])
+                written += end - h_out - start - h_in
+
+                if h_out:
+                    b_start = ranges[i + 1][0]
+                    fade_out = pcm[(end - h_out) * frame_bytes:(end + h_out) * frame_bytes]
+                    fade_in = pcm[(b_start - h_out) * frame_bytes:(b_start + h_out) * frame_bytes]
+                    out.writeframesraw(_crossfade(fade_out, fade_in, channels))
+                    written += 2 * h_out
+
+    return written
+
+
+# Encode settings for cached per-clip segments. Every segment uses the same
+# settings so they can be joined with the concat demuxer without re-encoding.
+# Segments keep audio as PCM: AAC is encoded once over the joined stream, so
+# there are no per-segment encoder priming gaps (clicks, A/V drift) at joins.
+SEGMENT_SUFFIX = '.mov'
+SEGMENT_ENCODE_ARGS = [
+    '-c:v', 'libx264', '-preset', 'fast', '-crf', '18', '-pix_fmt', 'yuv420p',
+    '-c:a', 'pcm_s16le', '-ar', '48000', '-ac', '2',
+]
+JOIN_ENCODE_ARGS = ['-c:v', 'copy', '-c:a', 'aac', '-b:a', '192k']
+SEGMENT_NAME_RE = re.compile(r'^[0-9a-f]{24}(\.partial)?\.(mov|mp4)$')
+
+
+def source_identity(video_path):
+    """Identify a source file by path, size and modification time"""
+    stat = Path(video_path).stat()
+    return f"{Path(video_path).resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def segment_cache_key(identity, start, end, encode_args=SEGMENT_ENCODE_ARGS):
+    """Cache key for one rendered segment: source identity, range and encode settings"""
+    payload = json.dumps([identity, f"{start:.6f}", f"{end:.6f}", list(encode_args)])
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+def stale_segments(cache_dir, keep):
+    """Cached segment files in cache_dir (incl. leftover partials) not in `keep`"""
+    keep = {Path(p).name for p in keep}
+    return sorted(p for p in Path(cache_dir).iterdir()
+                  if SEGMENT_NAME_RE.match(p.name) and p.name not in keep)
+
+
+def generate_concat_list(segment_paths):
+    """ffmpeg concat demuxer list for the given segment files"""
+    lines = []
+    for path in segment_paths:
+        escaped = str(Path(path).resolve()).replace("'", "'\\''")
+        lines.append(f"file '{escaped}'")
+    return '\n'.join(lines) + '\n'
+
+
+# JPEG images are at most 65535 px tall: 100 rows of 320 px wide thumbnails
+# stay under that even for portrait (9:16) sources
+SHEET_MAX_ROWS = 100
+SHOWINFO_TIME_BASE_RE = re.compile(r'config in time_base:\s*(\d+)/(\d+)')
+SHOWINFO_FRAME_RE = re.compile(r'\bn:\s*\d+\s+pts:\s*(-?\d+)\s+pts_time:\s*(-?[\d.e+-]+)')
+
+
+def clip_poster_times(timeline):
+    """Poster frame time (source seconds, clip midpoint) for each clip"""
+    return [(start + end) / 2 for start, end in clip_time_ranges(timeline)]
+
+
+def generate_poster_select(times, fps=30, width=320):
+    """
+    ffmpeg -filter_script selecting the first frame at or after each time.
+
+    Returns (filter_script, unique_times): frames come out in source order,
+    at most one per entry in unique_times (times closer than a frame are
+    merged). On variable frame rate sources several times can select the same
+    frame, so the script ends in showinfo: match frames back to times with
+    parse_showinfo_times and poster_frames rather than by position.
+    """
+    unique = []
+    for t in sorted(times):
+        if not unique or t - unique[-1] >= 1 / fps:
+            unique.append(t)
+
+    terms = '+'.join(f'gte(t,{t:.6f})*lt(prev_pts*TB,{t:.6f})' for t in unique)
+    return f"select='{terms}',scale={width}:-2,showinfo", unique
+
+
+def poster_index(times, unique_times):
+    """For each clip time, the index of its frame in unique_times"""
+    # Merged times map to the last unique time at or before them
+    return [max(0, bisect_right(unique_times, t) - 1) for t in times]
+
+
+def parse_showinfo_times(log):
+    """Source time in seconds of each frame reported by ffmpeg's showinfo filter"""
+    time_base = SHOWINFO_TIME_BASE_RE.search(log)
+    times = []
+    for match in SHOWINFO_FRAME_RE.finditer(log):
+        pts, pts_time = match.groups()
+        if time_base:
+            times.append(float(Fraction(int(pts)) * Fraction(int(time_base[1]), int(time_base[2]))))
+        else:
+            times.append(float(pts_time))
+    return times
+
+
+def poster_frames(times, unique_times, frame_times):
+    """
+    For each clip time, the index in frame_times of its poster frame: the
+    first extracted frame at or after the clip's (merged) select time.
+    """
+    frames = []
+    for idx in poster_index(times, unique_times):
+        target = round(unique_times[idx], 6) - 1e-9  # select compares against 6 decimals
+        frames.append(min(bisect_left(frame_times, target), len(frame_times) - 1))
+    return frames
+
+
+def contact_sheet_pages(n_thumbs, columns=8, max_rows=SHEET_MAX_ROWS):
+    """
+    Split n_thumbs into contact sheet images of at most max_rows rows.
+
+    Returns [(first, count, rows)]: 0-based index of the first thumbnail,
+    thumbnails on the sheet and its row count.
+    """
+    per_sheet = columns * max_rows
+    pages = []
+    for first in range(0, n_thumbs, per_sheet):
+        count = min(per_sheet, n_thumbs - first)
+        pages.append((first, count, math.ceil(count / columns)))
+    return pages
+
+
+def format_timecode(seconds):
+    """H:MM:SS.s timecode for display"""
+    minutes, secs = divmod(seconds, 60)
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{hours}:{minutes:02d}:{secs:04.1f}"
+
+
+def asset_uri(asset, asset_dir=None):
+    """file:// URI for a B-roll asset path, relative paths taken from asset_dir; None if unusable"""
+    try:
+        return (Path(asset_dir or '.') / asset).resolve().as_uri()
+    except (TypeError, ValueError, OSError):
+        return None
+
+
+def generate_contact_sheet_html(timeline, thumbnails, sheet_names=(), asset_dir=None):
+    """
+    HTML index of clip poster frames with transcript and take/B-roll markers.
+
+    Relative B-roll asset paths are resolved against asset_dir (the .otio's
+    directory), defaulting to the current directory.
+    """
+    rc_meta = timeline.metadata.get("rough-cut", {})
+    video_name = Path(rc_meta.get("source_video", "")).name
+
+    cards = []
+    clips = [item for item in timeline.tracks[0] if isinstance(item, otio.schema.Clip)]
+    for i, (clip, (start, end), thumb) in enumerate(zip(clips, clip_time_ranges(timeline), thumbnails), 1):
+        notes = []
+        for marker in clip.markers:
+            rc_marker = marker.metadata.get("rough-cut", {})
+            if rc_marker.get("type") == "take":
+                notes.append(f'<li class="take">{rc_marker.get("removed_count", 0)} takes removed</li>')
+            elif rc_marker.get("type") == "broll":
+                noun = html.escape(rc_marker.get("noun", ""))
+                uri = asset_uri(rc_marker["asset"], asset_dir) if rc_marker.get("asset") else None
+                if uri:
+                    noun = f'<a href="{html.escape(uri)}">{noun}</a>'
+                notes.append(f'<li class="broll">B-roll: {noun}</li>')
+
+        transcript = html.escape(clip.metadata.get("rough-cut", {}).get("transcript", "").strip())
+        cards.append(f'''    <figure>
+      <img src="{html.escape(thumb)}" loading="lazy" alt="Clip {i}">
+      <figcaption>
+        <b>{i}</b> {format_timecode(start)} &ndash; {format_timecode(end)}
+        <p>{transcript}</p>
+        <ul>{''.join(notes)}</ul>
+      </figcaption>
+    </figure>''')
+
+    sheet = ''
+    if len(sheet_names) == 1:
+        sheet = f'<p><a href="{html.escape(sheet_names[0])}">Contact sheet image</a></p>\n'
+    elif sheet_names:
+        links = ' '.join(f'<a href="{html.escape(name)}">{n}</a>' for n, name in enumerate(sheet_names, 1))
+        sheet = f'<p>Contact sheet images: {links}</p>\n'
+    return f'''<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="utf-8">
+  <title>Rough Cut: {html.escape(video_name)}</title>
+  <style>
+    body {{ font-family: -apple-system, sans-serif; margin: 1.5em; background: #111; color: #ddd; }}
+    main {{ display: grid; grid-template-columns: repeat(auto-fill, minmax(320px, 1fr)); gap: 1em; }}
+    figure {{ margin: 0; background: #1c1c1c; }}
+    img {{ width: 100%; display: block; }}
+    figcaption {{ padding: 0.5em; font-size: 0.85em; }}
+    p {{ margin: 0.3em 0; }}
+    ul {{ margin: 0; padding-left: 1.2em; }}
+    .take {{ color: #f66; }}
+    .broll {{ color: #6d6; }}
+    a {{ color: inherit; }}
+  </style>
+</head>
+<body>
+  <h1>{html.escape(video_name)} &mdash; {len(cards)} clips</h1>
+  {sheet}<main>
+{chr(10).join(cards)}
+  </main>
+</body>
+</html>
+'''
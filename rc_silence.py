@@ -6,16 +6,22 @@ from rc_common import RoughCutError, run_command
 logger = logging.getLogger(__name__)
 
 
-def detect_silences(video_path, output_path, threshold_db=-45, min_duration=0.5):
+def detect_silences(video_path, output_path, threshold_db=-45, min_duration=0.5, duration=None):
     """Detect silences with ffmpeg silencedetect"""
-    cmd = f'ffmpeg -i "{video_path}" -af silencedetect=n={threshold_db}dB:d={min_duration} -f null - 2>&1 | grep -E "silence_start|silence_end"'
+    cmd = [
+        'ffmpeg', '-i', str(video_path),
+        '-af', f'silencedetect=n={threshold_db}dB:d={min_duration}',
+        '-f', 'null', '-'
+    ]
 
-    result = run_command(cmd, "Detecting silences", capture_output=True, check=False)
+    result = run_command(cmd, "Detecting silences", capture_output=True, check=False, duration=duration)
 
+    lines = [line for line in result.stderr.splitlines(keepends=True)
+             if 'silence_start' in line or 'silence_end' in line]
     with open(output_path, 'w') as f:
-        f.write(result.stdout)
+        f.writelines(lines)
 
-    silence_count = result.stdout.count('silence_start')
+    silence_count = sum('silence_start' in line for line in lines)
     logger.info(f"  Found {silence_count} silence intervals")
 
 
@@ -0,0 +1,166 @@
+# Compact transcript store (.rct):
+#   Whisper's verbose JSON is converted once into a columnar binary file that
+#   loads via mmap without parsing. All integers are little-endian int32.
+#
+#   header:   magic "RCT1", flags, n_segments, n_words, seg_text_len, word_text_len
+#   columns:  seg_start[n], seg_end[n], seg_text_offsets[n+1],
+#             word_start[w], word_end[w], word_segment[w], word_text_offsets[w+1]
+#   blobs:    seg_text (utf-8), word_text (utf-8)
+#
+#   Times are milliseconds. Word-level timing is optional (w may be 0); it is
+#   taken from whisper-cli --output-json-full tokens when present.
+
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+from rc_common import RoughCutError
+
+MAGIC = b'RCT1'
+HEADER = struct.Struct('<4sIIIII')
+FLAG_MONOTONIC = 1  # segment starts and ends are both non-decreasing
+
+
+def _int_array(values):
+    arr = array('i', values)
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _text_columns(texts):
+    """utf-8 blob plus n+1 byte offsets"""
+    encoded = [t.encode('utf-8') for t in texts]
+    offsets = [0]
+    for e in encoded:
+        offsets.append(offsets[-1] + len(e))
+    return b''.join(encoded), offsets
+
+
+def segment_words(segment):
+    """Word-level (start_ms, end_ms, word) from whisper-cli full JSON tokens"""
+    words = []
+    for token in segment.get('tokens', []):
+        text = token.get('text', '')
+        if not text or text.startswith('[_'):
+            continue
+        start, end = token['offsets']['from'], token['offsets']['to']
+        # Tokens starting with a space begin a new word; others continue it
+        if words and not text.startswith(' '):
+            w_start, _, w_text = words[-1]
+            words[-1] = (w_start, end, w_text + text)
+        else:
+            words.append((start, end, text.strip()))
+    return [w for w in words if w[2]]
+
+
+def write_compact_transcript(transcript, path):
+    """Write whisper transcription entries to a compact .rct file"""
+    starts = [seg['offsets']['from'] for seg in transcript]
+    ends = [seg['offsets']['to'] for seg in transcript]
+    seg_blob, seg_offsets = _text_columns(seg['text'] for seg in transcript)
+
+    word_starts, word_ends, word_segs, word_texts = [], [], [], []
+    for i, seg in enumerate(transcript):
+        for start, end, text in segment_words(seg):
+            word_starts.append(start)
+            word_ends.append(end)
+            word_segs.append(i)
+            word_texts.append(text)
+    word_blob, word_offsets = _text_columns(word_texts)
+
+    monotonic = all(a <= b for a, b in zip(starts, starts[1:])) and \
+        all(a <= b for a, b in zip(ends, ends[1:]))
+    flags = FLAG_MONOTONIC if monotonic else 0
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, flags, len(starts), len(word_starts), len(seg_blob), len(word_blob)))
+        for column in (starts, ends, seg_offsets, word_starts, word_ends, word_segs, word_offsets):
+            f.write(_int_array(column))
+        f.write(seg_blob)
+        f.write(word_blob)
+
+
+class CompactTranscript:
+    """Memory-mapped view of a .rct transcript"""
+
+    def __init__(self, path):
+        try:
+            with open(path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            raise RoughCutError(f"Transcript file not found: {path}")
+        except ValueError:
+            raise RoughCutError(f"Invalid compact transcript: {path}")
+
+        if len(self._mmap) < HEADER.size:
+            raise RoughCutError(f"Invalid compact transcript: {path}")
+        magic, flags, n, w, seg_len, word_len = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise RoughCutError(f"Invalid compact transcript: {path}")
+        self.monotonic = bool(flags & FLAG_MONOTONIC)
+
+        view = self._view = memoryview(self._mmap)
+        pos = HEADER.size
+
+        def column(count):
+            nonlocal pos
+            data = view[pos:pos + 4 * count]
+            pos += 4 * count
+            if sys.byteorder == 'big':
+                arr = array('i', data.tobytes())
+                arr.byteswap()
+                return arr
+            return data.cast('i')
+
+        self.starts = column(n)
+        self.ends = column(n)
+        self._seg_offsets = column(n + 1)
+        self.word_starts = column(w)
+        self.word_ends = column(w)
+        self.word_segments = column(w)
+        self._word_offsets = column(w + 1)
+        self._seg_text = view[pos:pos + seg_len]
+        self._word_text = view[pos + seg_len:pos + seg_len + word_len]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def text(self, i):
+        """Text of segment i"""
+        return bytes(self._seg_text[self._seg_offsets[i]:self._seg_offsets[i + 1]]).decode('utf-8')
+
+    def word(self, i):
+        """Text of word i"""
+        return bytes(self._word_text[self._word_offsets[i]:self._word_offsets[i + 1]]).decode('utf-8')
+
+    def words(self, seg_index):
+        """(start_ms, end_ms, word) for each word in a segment"""
+        lo = bisect_left(self.word_segments, seg_index)
+        hi = bisect_right(self.word_segments, seg_index)
+        return [(self.word_starts[i], self.word_ends[i], self.word(i)) for i in range(lo, hi)]
+
+    def overlapping(self, start_ms, end_ms):
+        """Indices of segments overlapping (start_ms, end_ms)"""
+        if self.monotonic:
+            lo = bisect_right(self.ends, start_ms)
+            hi = bisect_left(self.starts, end_ms)
+            return [i for i in range(lo, hi) if self.ends[i] > start_ms]
+        return [i for i in range(len(self)) if self.starts[i] < end_ms and self.ends[i] > start_ms]
+
+    def close(self):
+        """Release the memory map"""
+        for name in ('starts', 'ends', '_seg_offsets', 'word_starts', 'word_ends',
+                     'word_segments', '_word_offsets', '_seg_text', '_word_text', '_view'):
+            value = getattr(self, name, None)
+            if isinstance(value, memoryview):
+                value.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
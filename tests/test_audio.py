@@ -1,6 +1,17 @@
+import json
+import socket
+import tempfile
+import threading
+import time
 import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
+from pathlib import Path
 
-from rc_audio import get_transcript_for_segment
+import rc_common
+from rc_audio import (get_transcript_for_segment, load_transcript, server_segments_to_transcription,
+                      transcribe_audio, transcribe_with_server, whisper_server_available)
+from rc_common import RoughCutError
+from rc_bench import patched_env, write_whisper_stub
 
 
 class TestGetTranscriptForSegment(unittest.TestCase):
@@ -27,5 +38,108 @@ class TestGetTranscriptForSegment(unittest.TestCase):
         self.assertEqual(indices, [])
 
 
+class _FakeWhisperServer(BaseHTTPRequestHandler):
+    segments = [{"start": 0.0, "end": 1.5, "text": " From the server"}]
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        body = json.dumps({"text": "From the server", "segments": self.segments}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _StalledWhisperServer(BaseHTTPRequestHandler):
+    """Accepts the upload, then never answers (a long transcription)"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        time.sleep(5)
+
+    def log_message(self, *args):
+        pass
+
+
+def _closed_port_url():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}"
+
+
+class TestWhisperServer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.audio = self.dir / 'audio.wav'
+        self.audio.write_bytes(b'RIFF')
+        self.output = self.dir / 'out.json'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_segments_conversion(self):
+        result = server_segments_to_transcription([{"start": 1.2345, "end": 2.5, "text": " Hi"}])
+        self.assertEqual(result, [{"offsets": {"from": 1234, "to": 2500}, "text": " Hi"}])
+
+    def test_segments_conversion_with_words(self):
+        segments = [{"start": 0.0, "end": 1.0, "text": " Hi there",
+                     "words": [{"word": "Hi", "start": 0.0, "end": 0.4}, {"word": " there", "start": 0.4, "end": 1.0}]}]
+        tokens = server_segments_to_transcription(segments)[0]['tokens']
+        self.assertEqual(tokens, [
+            {"text": " Hi", "offsets": {"from": 0, "to": 400}},
+            {"text": " there", "offsets": {"from": 400, "to": 1000}},
+        ])
+
+    def test_unreachable_server(self):
+        self.assertFalse(whisper_server_available(_closed_port_url()))
+
+    def test_uses_server_when_available(self):
+        server = HTTPServer(('127.0.0.1', 0), _FakeWhisperServer)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}"
+            transcribe_audio(self.audio, self.output, server_url=url)
+        finally:
+            server.shutdown()
+            server.server_close()
+        transcript = load_transcript(self.output)
+        self.assertEqual(transcript, [{"offsets": {"from": 0, "to": 1500}, "text": " From the server"}])
+
+    def _stalled_server(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _StalledWhisperServer)
+        server.daemon_threads = True
+        server.block_on_close = False
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    def test_server_wait_stops_on_interrupt(self):
+        url = self._stalled_server()
+        threading.Timer(0.3, rc_common._interrupted.set).start()
+        self.addCleanup(rc_common._interrupted.clear)
+        start = time.monotonic()
+        with self.assertRaisesRegex(RoughCutError, "Interrupted"):
+            transcribe_with_server(self.audio, self.output, url)
+        self.assertLess(time.monotonic() - start, 2)
+
+    def test_server_timeout(self):
+        with self.assertRaisesRegex(RoughCutError, "Timed out"):
+            transcribe_with_server(self.audio, self.output, self._stalled_server(), timeout=0.5)
+
+    def test_falls_back_to_cli(self):
+        canned = {"transcription": [{"offsets": {"from": 0, "to": 1000}, "text": " From the CLI"}]}
+        env = write_whisper_stub(self.dir / 'whisper', canned)
+        with patched_env(env):
+            transcribe_audio(self.audio, self.output, server_url=_closed_port_url())
+        self.assertEqual(json.loads(self.output.read_text()), canned)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,90 @@
+import json
+import tempfile
+import tracemalloc
+import unittest
+from pathlib import Path
+
+from rc_audio import transcribe_audio, get_transcript_for_segment
+from rc_broll import detect_timeline_nouns
+from rc_bench import (synth_bursts, synth_silences, synth_texts, synth_transcript,
+                      synth_intervals, write_whisper_stub, patched_env, StageTimer, merge_memory)
+from rc_silence import invert_silences
+from rc_takes import detect_takes
+
+
+class TestSynth(unittest.TestCase):
+
+    def test_silences_invert_to_bursts(self):
+        bursts = synth_bursts(60, speech=4.0, gap=1.0)
+        speech = invert_silences(synth_silences(bursts, 60), 60)
+        self.assertEqual([(s['start'], s['end']) for s in speech], bursts)
+
+    def test_texts_contain_takes(self):
+        texts = synth_texts(20, take_every=5, takes=3)
+        self.assertEqual(len(texts), 20)
+        intervals = [{'text': t} for t in texts]
+        removes, take_markers = detect_takes(intervals)
+        self.assertTrue(removes)
+        self.assertTrue(take_markers)
+
+    def test_texts_contain_proper_nouns(self):
+        texts = synth_texts(200)
+        self.assertTrue(all(t[0].isupper() for t in texts))
+        per_clip, unique = detect_timeline_nouns(texts)
+        self.assertIn('Final Cut Pro', unique)
+        self.assertGreater(sum(1 for nouns in per_clip if nouns), 50)
+
+    def test_texts_deterministic(self):
+        self.assertEqual(synth_texts(10, seed=1), synth_texts(10, seed=1))
+
+    def test_transcript_aligns_with_bursts(self):
+        bursts = synth_bursts(30)
+        transcript = synth_transcript(bursts)['transcription']
+        self.assertEqual(len(transcript), len(bursts))
+        start, end = bursts[2]
+        text, indices = get_transcript_for_segment(transcript, start, end)
+        self.assertEqual(indices, [2])
+
+    def test_intervals(self):
+        intervals = synth_intervals(50)
+        self.assertEqual(len(intervals), 50)
+        self.assertTrue(all(s['text'] for s in intervals))
+
+
+class TestWhisperStub(unittest.TestCase):
+
+    def test_transcribe_with_stub(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            transcript = synth_transcript(synth_bursts(20))
+            env = write_whisper_stub(tmp / 'whisper', transcript)
+            audio = tmp / 'audio.wav'
+            audio.touch()
+            output = tmp / 'out.json'
+            with patched_env(env):
+                transcribe_audio(audio, output)
+            self.assertEqual(json.loads(output.read_text()), transcript)
+
+
+class TestStageTimer(unittest.TestCase):
+
+    def test_untraced_by_default(self):
+        timer = StageTimer()
+        with timer.stage('work'):
+            self.assertFalse(tracemalloc.is_tracing())
+        self.assertEqual(set(timer.stages['work']), {'wall_s'})
+
+    def test_memory_from_traced_run(self):
+        timed, traced = StageTimer(), StageTimer(trace_memory=True)
+        for timer in (timed, traced):
+            with timer.stage('work'):
+                data = [0] * 100000
+        del data
+        self.assertFalse(tracemalloc.is_tracing())
+        stages = merge_memory(timed.stages, traced.stages)
+        self.assertGreater(stages['work']['peak_mb'], 0.5)
+        self.assertEqual(stages['work']['wall_s'], timed.stages['work']['wall_s'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,12 @@
+import os
+import tempfile
 import unittest
+from pathlib import Path
+from unittest import mock
 
-from rc_broll import detect_proper_nouns
+from rc_bench import synth_texts
+from rc_broll import (ASSET_FETCHERS, detect_proper_nouns, detect_timeline_nouns, fetch_asset,
+                      parse_saved_path)
 
 
 class TestDetectProperNouns(unittest.TestCase):
@@ -27,6 +33,78 @@ class TestDetectProperNouns(unittest.TestCase):
     def test_empty_input(self):
         self.assertEqual(detect_proper_nouns(""), [])
 
+    def test_phrase_words_not_repeated(self):
+        text = "I use Claude Code daily. Then Claude helps a lot."
+        result = detect_proper_nouns(text)
+        self.assertIn("Claude Code", result)
+        self.assertNotIn("Claude", result)
+
+    def test_phrase_words_match_whole_words(self):
+        # Only words of a detected phrase are excluded, not words containing them
+        result = detect_proper_nouns("We ordered a Rusty Nail while writing Rust code.")
+        self.assertEqual(result, ["Rust", "Rusty Nail"])
+
+
+class TestDetectTimelineNouns(unittest.TestCase):
+
+    def test_per_clip_and_unique(self):
+        texts = ["I like Python a lot.", "", "We ship Python and Rust daily."]
+        per_clip, unique = detect_timeline_nouns(texts)
+        self.assertEqual(per_clip, [["Python"], [], ["Python", "Rust"]])
+        self.assertEqual(unique, ["Python", "Rust"])
+
+    def test_phrase_words_scoped_to_clip(self):
+        texts = ["I use Claude Code daily.", "Then ask Claude again."]
+        self.assertEqual(detect_timeline_nouns(texts)[0], [["Claude Code"], ["Claude"]])
+
+    def test_matches_per_clip_detection(self):
+        texts = synth_texts(300) + [
+            "Ends with Stripe", " Starts with space and Vercel", "Ends with Python.", "Question Rust?",
+            "Stripe", None, "   ", "Final Cut Pro!", "and Final Cut Pro next", "Trailing Vercel\n"]
+        per_clip, unique = detect_timeline_nouns(texts)
+        expected = [detect_proper_nouns(text) for text in texts]
+        self.assertEqual(per_clip, expected)
+        self.assertEqual(unique, list(dict.fromkeys(n for nouns in expected for n in nouns)))
+
+    def test_empty_timeline(self):
+        self.assertEqual(detect_timeline_nouns([]), ([], []))
+
+
+class TestParseSavedPath(unittest.TestCase):
+
+    def test_get_logo_output(self):
+        output = "🔍 'stripe' (exact)\n   Fetching from stripe.com... ✓\n   Saved to: /tmp/logos/stripe.png\n"
+        self.assertEqual(parse_saved_path(output), "/tmp/logos/stripe.png")
+
+    def test_get_screenshot_output(self):
+        output = "   Capturing... ✓\n   Saved: /tmp/shots/stripe.png (1.2M)\n"
+        self.assertEqual(parse_saved_path(output), "/tmp/shots/stripe.png")
+
+    def test_get_screenshot_skip(self):
+        output = "   Capturing... ⚠️  File exists (skipping)\n   /tmp/shots/stripe.png\n"
+        self.assertEqual(parse_saved_path(output), "/tmp/shots/stripe.png")
+
+    def test_no_path(self):
+        self.assertIsNone(parse_saved_path("   ✗ Failed to fetch\n"))
+
+
+class TestFetchAsset(unittest.TestCase):
+
+    def test_relative_saved_path_is_resolved(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp).resolve()
+            script = tmp / 'fake-fetch'
+            script.write_text('#!/bin/sh\nmkdir -p "$2" && touch "$2/$3.png" && echo "Saved to: $2/$3.png"\n')
+            script.chmod(0o755)
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            try:
+                with mock.patch.dict(ASSET_FETCHERS, {'logo': (str(script), [])}):
+                    path = fetch_asset('stripe', 'logo', 'assets')
+            finally:
+                os.chdir(cwd)
+        self.assertEqual(path, str(tmp / 'assets' / 'stripe.png'))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,172 @@
+import asyncio
+import os
+import signal
+import sys
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from rc_bench import patched_env
+import rc_common
+from rc_common import RoughCutError, format_progress, format_eta, run_command, run_command_async
+
+
+def _fake_tool(bin_dir, name, body):
+    """Write an executable python script named `name` into bin_dir"""
+    path = Path(bin_dir) / name
+    path.write_text(f"#!{sys.executable}\nimport sys\n{body}\n")
+    path.chmod(0o755)
+    return path
+
+
+class TestRunCommand(unittest.TestCase):
+
+    def test_capture_output(self):
+        result = run_command([sys.executable, '-c', 'print("hello")'], "Echo", capture_output=True)
+        self.assertEqual(result.stdout, "hello\n")
+        self.assertEqual(result.returncode, 0)
+
+    def test_string_command_is_not_run_by_a_shell(self):
+        result = run_command("echo 'a b' | cat", "Echo", capture_output=True)
+        self.assertEqual(result.stdout, "a b | cat\n")
+
+    def test_failure_raises(self):
+        with self.assertRaises(RoughCutError):
+            run_command([sys.executable, '-c', 'import sys; sys.exit(3)'], "Fail", capture_output=True)
+
+    def test_failure_without_check(self):
+        result = run_command([sys.executable, '-c', 'import sys; sys.exit(3)'], "Fail",
+                             capture_output=True, check=False)
+        self.assertEqual(result.returncode, 3)
+
+    def test_stdin_is_not_inherited(self):
+        script = "import os, sys; print(sys.stdin.isatty(), os.read(0, 1))"
+        result = run_command([sys.executable, '-c', script], "Stdin", capture_output=True)
+        self.assertEqual(result.stdout, "False b''\n")
+
+    def test_missing_command(self):
+        with self.assertRaises(RoughCutError):
+            run_command(['definitely-not-a-real-command-xyz'], "Missing")
+
+    def test_timeout_kills_process_group(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pid_file = Path(tmp) / 'pid'
+            script = (
+                "import subprocess, time\n"
+                f"p = subprocess.Popen(['sleep', '30'])\n"
+                f"open({str(pid_file)!r}, 'w').write(str(p.pid))\n"
+                "time.sleep(30)\n"
+            )
+            start = time.monotonic()
+            with self.assertRaises(RoughCutError):
+                run_command([sys.executable, '-c', script], "Sleep", timeout=1)
+            self.assertLess(time.monotonic() - start, 10)
+
+            grandchild = int(pid_file.read_text())
+            for _ in range(50):
+                try:
+                    os.kill(grandchild, 0)
+                except ProcessLookupError:
+                    break
+                time.sleep(0.1)
+            else:
+                self.fail("grandchild process survived timeout")
+
+    def test_concurrent_async(self):
+        async def both():
+            return await asyncio.gather(
+                run_command_async([sys.executable, '-c', 'import time; time.sleep(0.5); print(1)'], "One",
+                                  capture_output=True),
+                run_command_async([sys.executable, '-c', 'import time; time.sleep(0.5); print(2)'], "Two",
+                                  capture_output=True),
+            )
+        start = time.monotonic()
+        one, two = asyncio.run(both())
+        self.assertLess(time.monotonic() - start, 0.95)
+        self.assertEqual((one.stdout, two.stdout), ("1\n", "2\n"))
+
+
+class TestInterrupt(unittest.TestCase):
+
+    def tearDown(self):
+        rc_common._interrupted.clear()
+
+    @unittest.skipUnless(signal.getsignal(signal.SIGINT) is rc_common._on_sigint, "SIGINT handler not installed")
+    def test_sigint_kills_commands_started_from_threads(self):
+        def sleep(_):
+            return run_command(['sleep', '30'], "Sleep", check=False)
+
+        start = time.monotonic()
+        pool = ThreadPoolExecutor(max_workers=2)
+        # More jobs than workers: the queued ones must not start after the interrupt
+        futures = [pool.submit(sleep, i) for i in range(4)]
+        while len(rc_common._active_groups) < 2:
+            time.sleep(0.05)
+        pids = set(rc_common._active_groups)
+
+        with self.assertRaises(KeyboardInterrupt):
+            os.kill(os.getpid(), signal.SIGINT)
+            time.sleep(5)
+        pool.shutdown(wait=True)
+        self.assertLess(time.monotonic() - start, 10)
+
+        results = [f.exception() or f.result() for f in futures]
+        self.assertEqual([r.returncode for r in results[:2]], [-signal.SIGKILL] * 2)
+        self.assertTrue(all(isinstance(r, RoughCutError) for r in results[2:]))
+        for pid in pids:
+            with self.assertRaises(ProcessLookupError):
+                os.kill(pid, 0)
+
+
+class TestProgressStreams(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = {'PATH': f"{self.tmp.name}{os.pathsep}{os.environ.get('PATH', '')}"}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_ffmpeg_progress_not_captured(self):
+        _fake_tool(self.tmp.name, 'ffmpeg', (
+            "assert sys.argv[1:4] == ['-nostats', '-progress', 'pipe:1'], sys.argv\n"
+            "print('out_time_us=500000')\n"
+            "print('progress=end')\n"
+            "sys.stderr.write('silence_start: 1.0\\n')"
+        ))
+        with patched_env(self.env):
+            result = run_command(['ffmpeg', '-i', 'x'], "Fake ffmpeg", capture_output=True, duration=1.0)
+        self.assertEqual(result.stdout, "")
+        self.assertEqual(result.stderr, "silence_start: 1.0\n")
+
+    def test_whisper_progress_not_captured(self):
+        _fake_tool(self.tmp.name, 'whisper-cli', (
+            "assert sys.argv[-1] == '--print-progress', sys.argv\n"
+            "sys.stderr.write('whisper_print_progress_callback: progress =  50%\\n')\n"
+            "sys.stderr.write('model loaded\\n')"
+        ))
+        with patched_env(self.env):
+            result = run_command(['whisper-cli', '-f', 'a.wav'], "Fake whisper", capture_output=True)
+        self.assertEqual(result.stderr, "model loaded\n")
+
+
+class TestFormatProgress(unittest.TestCase):
+
+    def test_eta(self):
+        self.assertEqual(format_eta(65), "1:05")
+        self.assertEqual(format_eta(3725), "1:02:05")
+
+    def test_with_total(self):
+        text = format_progress("Extracting audio", 30, 120, time.monotonic() - 10)
+        self.assertTrue(text.startswith("Extracting audio 25% 0:30/2:00 3.0x ETA 0:3"))
+
+    def test_without_total(self):
+        text = format_progress("Rendering", 30, None, time.monotonic() - 10)
+        self.assertTrue(text.startswith("Rendering 0:30 3.0x"))
+        self.assertNotIn("ETA", text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,17 @@
+import tempfile
 import unittest
+import wave
 import xml.etree.ElementTree as ET
+from array import array
+from pathlib import Path
 
 import opentimelineio as otio
 
-from rc_export import sanitize_name, sanitize_note, seconds_to_frames, generate_fcpxml_from_otio
+from rc_export import (sanitize_name, sanitize_note, seconds_to_frames, generate_fcpxml_from_otio,
+                       clip_sample_ranges, splice_pcm, clip_time_ranges, source_identity,
+                       segment_cache_key, generate_concat_list, stale_segments, clip_poster_times,
+                       generate_poster_select, poster_index, parse_showinfo_times, poster_frames,
+                       contact_sheet_pages, format_timecode, generate_contact_sheet_html)
 
 
 def _make_timeline(intervals, take_markers=None, video_path="test.mp4", duration=10.0, fps=30):
@@ -170,5 +178,177 @@ class TestGenerateFcpxmlFromOtio(unittest.TestCase):
         self.assertEqual(timeline_offset, 0)
 
 
+class TestClipSampleRanges(unittest.TestCase):
+
+    def test_frames_to_samples(self):
+        intervals = [{'start': 1.0, 'duration': 2.0}, {'start': 5.0, 'duration': 1.0}]
+        timeline = _make_timeline(intervals)
+        # duration includes 2 post-roll frames (1600 samples at 30fps/48kHz)
+        self.assertEqual(clip_sample_ranges(timeline, 48000),
+                         [(48000, 48000 + 96000 + 3200), (240000, 240000 + 48000 + 3200)])
+
+    def test_empty_timeline(self):
+        self.assertEqual(clip_sample_ranges(_make_timeline([])), [])
+
+
+class TestSplicePcm(unittest.TestCase):
+
+    def _splice(self, samples, ranges, channels=1, crossfade_ms=0, sample_rate=1000):
+        with tempfile.TemporaryDirectory() as tmp:
+            pcm = Path(tmp) / 'in.pcm'
+            pcm.write_bytes(array('h', samples).tobytes())
+            out = Path(tmp) / 'out.wav'
+            frames = splice_pcm(pcm, ranges, out, sample_rate, channels, crossfade_ms)
+            with wave.open(str(out), 'rb') as w:
+                data = array('h', w.readframes(w.getnframes()))
+        return frames, list(data)
+
+    def test_exact_slices(self):
+        frames, data = self._splice(list(range(100)), [(10, 20), (50, 55)])
+        self.assertEqual(frames, 15)
+        self.assertEqual(data, list(range(10, 20)) + list(range(50, 55)))
+
+    def test_crossfade_preserves_length(self):
+        source = [1000] * 50 + [-1000] * 50
+        frames, data = self._splice(source, [(0, 30), (60, 90)], crossfade_ms=10)
+        self.assertEqual(frames, 60)
+        self.assertEqual(len(data), 60)
+        self.assertEqual(data[:25], [1000] * 25)
+        self.assertEqual(data[35:], [-1000] * 25)
+        # Fade region moves monotonically from the outgoing to the incoming clip
+        fade = data[25:35]
+        self.assertEqual(fade, sorted(fade, reverse=True))
+
+    def test_stereo(self):
+        source = [i for n in range(20) for i in (n, -n)]
+        frames, data = self._splice(source, [(5, 8)], channels=2)
+        self.assertEqual(frames, 3)
+        self.assertEqual(data, [5, -5, 6, -6, 7, -7])
+
+    def test_no_ranges(self):
+        frames, data = self._splice(list(range(10)), [])
+        self.assertEqual((frames, data), (0, []))
+
+
+class TestSegmentCache(unittest.TestCase):
+
+    def test_clip_time_ranges(self):
+        timeline = _make_timeline([{'start': 1.0, 'duration': 2.0}])
+        ranges = clip_time_ranges(timeline)
+        self.assertEqual(len(ranges), 1)
+        self.assertAlmostEqual(ranges[0][0], 1.0)
+        self.assertAlmostEqual(ranges[0][1], 3.0 + 2 / 30)
+
+    def test_key_stable(self):
+        self.assertEqual(segment_cache_key("src:1:2", 1.0, 2.0), segment_cache_key("src:1:2", 1.0, 2.0))
+
+    def test_key_changes(self):
+        base = segment_cache_key("src:1:2", 1.0, 2.0)
+        self.assertNotEqual(base, segment_cache_key("src:1:3", 1.0, 2.0))
+        self.assertNotEqual(base, segment_cache_key("src:1:2", 1.0, 2.1))
+        self.assertNotEqual(base, segment_cache_key("src:1:2", 1.0, 2.0, ['-crf', '20']))
+
+    def test_source_identity_tracks_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            video = Path(tmp) / 'v.mov'
+            video.write_bytes(b'a')
+            before = source_identity(video)
+            video.write_bytes(b'ab')
+            self.assertNotEqual(before, source_identity(video))
+
+    def test_stale_segments(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            used = tmp / f"{segment_cache_key('src:1:2', 1.0, 2.0)}.mov"
+            unused = tmp / f"{segment_cache_key('src:1:2', 2.0, 3.0)}.mov"
+            partial = tmp / f"{segment_cache_key('src:1:2', 3.0, 4.0)}.partial.mov"
+            other = tmp / 'notes.mov'
+            for path in (used, unused, partial, other):
+                path.write_bytes(b'')
+            self.assertEqual(stale_segments(tmp, [used]), sorted([unused, partial]))
+
+    def test_concat_list_escapes_quotes(self):
+        listing = generate_concat_list(["/tmp/it's.mp4", "/tmp/b.mp4"])
+        self.assertEqual(listing, "file '/tmp/it'\\''s.mp4'\nfile '/tmp/b.mp4'\n")
+
+
+class TestContactSheet(unittest.TestCase):
+
+    def test_poster_times_are_midpoints(self):
+        timeline = _make_timeline([{'start': 3.0, 'duration': 2.0 - 2 / 30}])
+        self.assertAlmostEqual(clip_poster_times(timeline)[0], 4.0, places=2)
+
+    def test_select_merges_close_times(self):
+        script, unique = generate_poster_select([5.0, 1.0, 1.01, 3.0], fps=30)
+        self.assertEqual(unique, [1.0, 3.0, 5.0])
+        self.assertTrue(script.startswith("select='gte(t,1.000000)*lt(prev_pts*TB,1.000000)+"))
+        self.assertTrue(script.endswith("',scale=320:-2,showinfo"))
+
+    def test_poster_index(self):
+        self.assertEqual(poster_index([5.0, 1.0, 1.01, 3.0], [1.0, 3.0, 5.0]), [2, 0, 0, 1])
+
+    def test_parse_showinfo_times(self):
+        log = ("[Parsed_showinfo_2 @ 0x1] config in time_base: 1/15360, frame_rate: 30/1\n"
+               "[Parsed_showinfo_2 @ 0x1] n:   0 pts:  15872 pts_time:1.03333 duration:512\n"
+               "[Parsed_showinfo_2 @ 0x1]  color_range:tv\n"
+               "[Parsed_showinfo_2 @ 0x1] n:   1 pts:  46080 pts_time:3       duration:512\n")
+        times = parse_showinfo_times(log)
+        self.assertAlmostEqual(times[0], 15872 / 15360, places=9)
+        self.assertEqual(times[1], 3.0)
+
+    def test_parse_showinfo_times_without_time_base(self):
+        self.assertEqual(parse_showinfo_times("n:   0 pts:  1 pts_time:2.5 duration:1\n"), [2.5])
+
+    def test_poster_frames_by_timestamp(self):
+        # VFR: 1.0 and 1.5 fall in one long frame (0.9-2.0), so only two frames come out
+        times = [3.0, 1.0, 1.5]
+        _, unique = generate_poster_select(times, fps=30)
+        self.assertEqual(poster_frames(times, unique, [2.0, 3.1]), [1, 0, 0])
+
+    def test_poster_frames_past_last_frame(self):
+        self.assertEqual(poster_frames([1.0, 9.0], [1.0, 9.0], [1.0]), [0, 0])
+
+    def test_contact_sheet_pages_cap_rows(self):
+        self.assertEqual(contact_sheet_pages(10, columns=8, max_rows=100), [(0, 10, 2)])
+        self.assertEqual(contact_sheet_pages(2000, columns=8, max_rows=100),
+                         [(0, 800, 100), (800, 800, 100), (1600, 400, 50)])
+        self.assertEqual(contact_sheet_pages(0), [])
+
+    def test_html_links_every_sheet(self):
+        timeline = _make_timeline([{'start': 0.0, 'duration': 1.0}])
+        page = generate_contact_sheet_html(timeline, ["a.jpg"], ["contact-sheet-01.jpg", "contact-sheet-02.jpg"])
+        self.assertIn('<a href="contact-sheet-01.jpg">1</a> <a href="contact-sheet-02.jpg">2</a>', page)
+        self.assertNotIn('Contact sheet image', generate_contact_sheet_html(timeline, ["a.jpg"]))
+
+    def test_format_timecode(self):
+        self.assertEqual(format_timecode(3725.25), "1:02:05.2")
+
+    def test_html_includes_markers(self):
+        timeline = _make_timeline(
+            [{'start': 0.0, 'duration': 1.0, 'text': 'Use <Stripe> & more'}, {'start': 2.0, 'duration': 1.0}],
+            take_markers={0: {'removed_count': 2, 'sample_text': 'use stripe'}})
+        timeline.tracks[0][1].markers.append(otio.schema.Marker(
+            name="B-roll: Stripe", metadata={"rough-cut": {"type": "broll", "noun": "Stripe"}}))
+        page = generate_contact_sheet_html(timeline, ["thumbs/clip-00001.jpg", "thumbs/clip-00002.jpg"],
+                                           ["contact-sheet.jpg"])
+        self.assertIn('2 takes removed', page)
+        self.assertIn('B-roll: Stripe', page)
+        self.assertIn('Use &lt;Stripe&gt; &amp; more', page)
+        self.assertIn('src="thumbs/clip-00002.jpg"', page)
+        self.assertIn('href="contact-sheet.jpg"', page)
+
+    def test_html_asset_links_resolve_relative_paths(self):
+        timeline = _make_timeline([{'start': 0.0, 'duration': 1.0}, {'start': 2.0, 'duration': 1.0}])
+        timeline.tracks[0][0].markers.append(otio.schema.Marker(
+            name="B-roll: Stripe", metadata={"rough-cut": {
+                "type": "broll", "noun": "Stripe", "asset": "broll/stripe.png"}}))
+        timeline.tracks[0][1].markers.append(otio.schema.Marker(
+            name="B-roll: Vercel", metadata={"rough-cut": {
+                "type": "broll", "noun": "Vercel", "asset": "/tmp/vercel.png"}}))
+        page = generate_contact_sheet_html(timeline, ["a.jpg", "b.jpg"], asset_dir="/work/video")
+        self.assertIn('href="file:///work/video/broll/stripe.png"', page)
+        self.assertIn('href="file:///tmp/vercel.png"', page)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,87 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from rc_audio import get_transcript_for_segment
+from rc_common import RoughCutError
+from rc_transcript import CompactTranscript, segment_words, write_compact_transcript
+
+
+TRANSCRIPT = [
+    {"offsets": {"from": 0, "to": 2000}, "text": " First part",
+     "tokens": [
+         {"text": "[_BEG_]", "offsets": {"from": 0, "to": 0}},
+         {"text": " First", "offsets": {"from": 0, "to": 800}},
+         {"text": " pa", "offsets": {"from": 800, "to": 1400}},
+         {"text": "rt", "offsets": {"from": 1400, "to": 2000}},
+     ]},
+    {"offsets": {"from": 2000, "to": 4000}, "text": " Second café"},
+    {"offsets": {"from": 4000, "to": 6000}, "text": " Third part"},
+]
+
+
+class TestSegmentWords(unittest.TestCase):
+
+    def test_joins_subword_tokens(self):
+        self.assertEqual(segment_words(TRANSCRIPT[0]), [(0, 800, "First"), (800, 2000, "part")])
+
+    def test_no_tokens(self):
+        self.assertEqual(segment_words(TRANSCRIPT[1]), [])
+
+
+class TestCompactTranscript(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "t.rct"
+        write_compact_transcript(TRANSCRIPT, self.path)
+        self.transcript = CompactTranscript(self.path)
+
+    def tearDown(self):
+        self.transcript.close()
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        self.assertEqual(len(self.transcript), 3)
+        self.assertEqual(list(self.transcript.starts), [0, 2000, 4000])
+        self.assertEqual(list(self.transcript.ends), [2000, 4000, 6000])
+        self.assertEqual(self.transcript.text(1), " Second café")
+
+    def test_words(self):
+        self.assertEqual(self.transcript.words(0), [(0, 800, "First"), (800, 2000, "part")])
+        self.assertEqual(self.transcript.words(2), [])
+
+    def test_matches_dict_lookup(self):
+        for start, end in [(1.0, 3.0), (2.0, 4.0), (0.0, 6.0), (6.5, 7.0), (2.5, 2.6)]:
+            self.assertEqual(get_transcript_for_segment(self.transcript, start, end),
+                             get_transcript_for_segment(TRANSCRIPT, start, end))
+
+    def test_non_monotonic(self):
+        path = Path(self.tmp.name) / "n.rct"
+        shuffled = [TRANSCRIPT[2], TRANSCRIPT[0], TRANSCRIPT[1]]
+        write_compact_transcript(shuffled, path)
+        with CompactTranscript(path) as transcript:
+            self.assertFalse(transcript.monotonic)
+            self.assertEqual(get_transcript_for_segment(transcript, 1.0, 3.0),
+                             get_transcript_for_segment(shuffled, 1.0, 3.0))
+
+    def test_empty(self):
+        path = Path(self.tmp.name) / "e.rct"
+        write_compact_transcript([], path)
+        with CompactTranscript(path) as transcript:
+            self.assertEqual(len(transcript), 0)
+            self.assertEqual(get_transcript_for_segment(transcript, 0, 1), ("", []))
+
+    def test_missing_file(self):
+        with self.assertRaises(RoughCutError):
+            CompactTranscript(Path(self.tmp.name) / "missing.rct")
+
+    def test_invalid_file(self):
+        path = Path(self.tmp.name) / "bad.rct"
+        path.write_bytes(b"not a transcript file at all")
+        with self.assertRaises(RoughCutError):
+            CompactTranscript(path)
+
+
+if __name__ == '__main__':
+    unittest.main()